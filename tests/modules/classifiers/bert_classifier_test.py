@@ -15,6 +15,8 @@
 Unit tests for BERT classifiers.
 """
 
+import os
+import tempfile
 import unittest
 
 import torch
@@ -22,6 +24,16 @@ import torch
 from texar.torch.modules.classifiers.bert_classifier import *
 from texar.torch.utils.test import pretrained_test
 
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+try:
+    from torch.utils._python_dispatch import TorchDispatchMode
+except ImportError:
+    TorchDispatchMode = None
+
 
 class BERTClassifierTest(unittest.TestCase):
     r"""Tests :class:`~texar.torch.modules.BERTClassifier` class.
@@ -72,6 +84,23 @@ class BERTClassifierTest(unittest.TestCase):
         self.assertEqual(len(classifier.trainable_variables), 199 + 2)
         _, _ = classifier(self.inputs)
 
+    def test_invalid_hparams(self):
+        r"""Tests that invalid hyperparameters are rejected at construction.
+        """
+        hparams = {
+            "pretrained_model_name": None,
+            "clas_strategy": "last_time",
+        }
+        with self.assertRaises(ValueError):
+            BERTClassifier(hparams=hparams)
+
+        hparams = {
+            "pretrained_model_name": None,
+            "clas_strategy": "all_time",
+        }
+        with self.assertRaises(ValueError):
+            BERTClassifier(hparams=hparams)
+
     def test_classification(self):
         r"""Tests classification.
         """
@@ -175,6 +204,289 @@ class BERTClassifierTest(unittest.TestCase):
         self.assertEqual(logits.shape, torch.Size([self.batch_size]))
         self.assertEqual(preds.shape, torch.Size([self.batch_size]))
 
+        # case 4
+        for preds_dtype, dtype in [("bool", torch.bool), ("int8", torch.int8)]:
+            hparams = {
+                "pretrained_model_name": None,
+                "num_classes": 1,
+                "preds_dtype": preds_dtype,
+            }
+            classifier = BERTClassifier(hparams=hparams)
+            logits, preds = classifier(inputs)
+
+            self.assertEqual(preds.dtype, dtype)
+            self.assertEqual(preds.shape, torch.Size([self.batch_size]))
+            self.assertTrue(torch.equal(preds.long(), (logits > 0).long()))
+
+    def test_all_time_logits(self):
+        r"""Tests that `all_time` logits computed on unpadded inputs match
+        those computed on inputs padded to `max_seq_length`.
+        """
+        max_seq_length = 8
+        hparams = {
+            "pretrained_model_name": None,
+            "clas_strategy": "all_time",
+            "max_seq_length": max_seq_length,
+        }
+        classifier = BERTClassifier(hparams=hparams)
+        classifier.eval()
+        logits_layer = classifier._logits_layer
+
+        for batch_size, max_length in [(3, 5), (2, 3), (3, 8)]:
+            inputs = torch.randint(30521, (batch_size, max_length))
+            logits, _ = classifier(inputs)
+
+            enc_outputs, _ = classifier._encoder(inputs)
+            enc_outputs = torch.nn.functional.pad(
+                enc_outputs, [0, 0, 0, max_seq_length - max_length])
+            expected = logits_layer(enc_outputs.view(batch_size, -1))
+            self.assertTrue(torch.allclose(logits, expected, atol=1e-5))
+
+        inputs = torch.randint(30521, (self.batch_size, max_seq_length + 1))
+        with self.assertRaises(ValueError):
+            classifier(inputs)
+        # Checked before the encoder, which only supports 512 positions
+        inputs = torch.randint(30521, (self.batch_size, 600))
+        with self.assertRaises(ValueError):
+            classifier(inputs)
+
+    def test_trim_to_max_length(self):
+        r"""Tests removing padding beyond the longest sequence before
+        encoding, which should be equivalent to feeding inputs padded only up
+        to the longest sequence. Inputs may be padded beyond
+        ``max_seq_length`` as long as the sequences are not longer.
+        """
+        inputs = torch.randint(30521, (self.batch_size, 10))
+        sequence_length = torch.tensor([3, 2])
+
+        for strategy in ["cls_time", "time_wise", "all_time"]:
+            hparams = {
+                "pretrained_model_name": None,
+                "clas_strategy": strategy,
+                "max_seq_length": 8,
+                "trim_to_max_length": True,
+            }
+            classifier = BERTClassifier(hparams=hparams)
+            classifier.eval()
+            logits, preds = classifier(inputs, sequence_length)
+            expected, _ = classifier(inputs[:, :3], sequence_length)
+
+            if strategy == "time_wise":
+                self.assertEqual(preds.shape, inputs.shape)
+                self.assertTrue(torch.equal(
+                    logits[:, 3:], torch.zeros_like(logits[:, 3:])))
+                logits = logits[:, :3]
+            self.assertTrue(torch.allclose(logits, expected, atol=1e-5))
+
+    def test_quantize_dynamic(self):
+        r"""Tests dynamic quantization.
+        """
+        inputs = torch.randint(30521, (self.batch_size, self.max_length))
+
+        hparams = {
+            "pretrained_model_name": None,
+            "clas_strategy": "all_time",
+            "max_seq_length": 8,
+        }
+        classifier = BERTClassifier(hparams=hparams)
+        classifier.eval()
+        quantized = classifier.quantize_dynamic()
+
+        self.assertIsInstance(classifier._logits_layer, torch.nn.Linear)
+        self.assertNotIsInstance(quantized._logits_layer, torch.nn.Linear)
+
+        logits, preds = quantized(inputs)
+        self.assertEqual(logits.shape, torch.Size(
+            [self.batch_size, classifier.output_size]))
+        self.assertEqual(preds.shape, torch.Size([self.batch_size]))
+
+    @unittest.skipUnless(onnxruntime is not None,
+                         "Test requires onnxruntime.")
+    def test_to_onnx(self):
+        r"""Tests exporting to ONNX, by comparing the outputs of the exported
+        model in onnxruntime with those of the classifier.
+        """
+        for strategy in ["cls_time", "all_time", "time_wise"]:
+            hparams = {
+                "pretrained_model_name": None,
+                "clas_strategy": strategy,
+                "max_seq_length": 8,
+            }
+            classifier = BERTClassifier(hparams=hparams)
+            classifier.eval()
+
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                path = os.path.join(tmp_dir, "classifier.onnx")
+                classifier.to_onnx(path, seq_length=6)
+                session = onnxruntime.InferenceSession(
+                    path, providers=["CPUExecutionProvider"])
+
+            # Both the batch and the time dimensions differ from the example
+            # inputs used for export, except for `all_time`.
+            max_time = 8 if strategy == "all_time" else 5
+            inputs = torch.randint(30521, (3, max_time))
+            sequence_length = torch.tensor([max_time, 2, 4])
+            segment_ids = torch.randint(2, (3, max_time))
+            logits, preds = session.run(None, {
+                "inputs": inputs.numpy(),
+                "sequence_length": sequence_length.numpy(),
+                "segment_ids": segment_ids.numpy(),
+            })
+            with torch.no_grad():
+                expected_logits, expected_preds = classifier(
+                    inputs, sequence_length, segment_ids)
+            self.assertTrue(torch.allclose(
+                torch.from_numpy(logits), expected_logits, atol=1e-4))
+            self.assertTrue(torch.equal(
+                torch.from_numpy(preds), expected_preds))
+
+    @unittest.skipUnless(TorchDispatchMode is not None,
+                         "Test requires TorchDispatchMode.")
+    def test_forward_without_sync(self):
+        r"""Tests that the forward computation does not read tensor values
+        on the host, which would make it impossible to capture into a CUDA
+        graph.
+        """
+        class OpRecorder(TorchDispatchMode):
+            def __init__(self):
+                super().__init__()
+                self.ops = set()
+
+            def __torch_dispatch__(self, func, types, args=(), kwargs=None):
+                self.ops.add(func.overloadpacket.__name__)
+                return func(*args, **(kwargs or {}))
+
+        inputs = torch.randint(30521, (self.batch_size, self.max_length))
+        sequence_length = torch.tensor([3, 2])
+
+        for strategy in ["cls_time", "all_time", "time_wise"]:
+            hparams = {
+                "pretrained_model_name": None,
+                "clas_strategy": strategy,
+                "max_seq_length": 8,
+            }
+            classifier = BERTClassifier(hparams=hparams)
+            classifier.eval()
+            with torch.no_grad(), OpRecorder() as recorder:
+                classifier(inputs, sequence_length)
+            self.assertNotIn("_local_scalar_dense", recorder.ops)
+
+    @unittest.skipUnless(torch.cuda.is_available(), "Test requires CUDA.")
+    def test_cuda_graph(self):
+        r"""Tests capturing and replaying CUDA graphs.
+        """
+        device = torch.device("cuda")
+        for strategy in ["cls_time", "all_time", "time_wise"]:
+            hparams = {
+                "pretrained_model_name": None,
+                "clas_strategy": strategy,
+                "max_seq_length": 8,
+            }
+            classifier = BERTClassifier(hparams=hparams).to(device)
+            classifier.eval()
+
+            inputs = torch.randint(
+                30521, (self.batch_size, self.max_length), device=device)
+            sequence_length = torch.tensor([3, 4], device=device)
+            classifier.capture_graph(inputs, sequence_length)
+
+            inputs = torch.randint(
+                30521, (self.batch_size, self.max_length), device=device)
+            sequence_length = torch.tensor([4, 2], device=device)
+            logits, preds = classifier.replay_graph(inputs, sequence_length)
+            with torch.no_grad():
+                expected_logits, expected_preds = classifier(
+                    inputs, sequence_length)
+            self.assertTrue(torch.allclose(logits, expected_logits, atol=1e-4))
+            self.assertTrue(torch.equal(preds, expected_preds))
+
+            # Inputs must match those given to `capture_graph`
+            with self.assertRaises(ValueError):
+                classifier.replay_graph(inputs[:1], sequence_length[:1])
+            with self.assertRaises(ValueError):
+                classifier.replay_graph(inputs.int(), sequence_length)
+            with self.assertRaises(ValueError):
+                classifier.replay_graph(inputs)
+            with self.assertRaises(ValueError):
+                classifier.replay_graph(inputs, sequence_length,
+                                        torch.zeros_like(inputs))
+
+    @unittest.skipUnless(hasattr(torch, "compile"),
+                         "Test requires PyTorch 2.0 or higher.")
+    def test_compile(self):
+        r"""Tests compiling :meth:`forward`, by comparing the outputs with
+        those of the uncompiled implementation.
+        """
+        inputs = torch.randint(30521, (self.batch_size, self.max_length))
+        sequence_length = torch.tensor([3, 2])
+
+        for strategy in ["cls_time", "all_time", "time_wise"]:
+            hparams = {
+                "pretrained_model_name": None,
+                "clas_strategy": strategy,
+                "max_seq_length": 8,
+                "compile": True,
+            }
+            classifier = BERTClassifier(hparams=hparams)
+            classifier.eval()
+            with torch.no_grad():
+                logits, preds = classifier(inputs, sequence_length)
+                expected_logits, expected_preds = classifier._forward_impl(
+                    inputs, sequence_length, None)
+
+            self.assertTrue(torch.allclose(logits, expected_logits, atol=1e-4))
+            self.assertTrue(torch.equal(preds, expected_preds))
+
+    @unittest.skipUnless(hasattr(torch, "compile"),
+                         "Test requires PyTorch 2.0 or higher.")
+    def test_compile_preds(self):
+        r"""Tests compiling the computation of predictions.
+        """
+        inputs = torch.randint(30521, (self.batch_size, self.max_length))
+
+        for num_classes in [1, 10]:
+            hparams = {
+                "pretrained_model_name": None,
+                "num_classes": num_classes,
+                "clas_strategy": "time_wise",
+                "compile_preds": True,
+            }
+            classifier = BERTClassifier(hparams=hparams)
+            classifier.eval()
+            logits, preds = classifier(inputs)
+
+            self.assertEqual(preds.shape, torch.Size(
+                [self.batch_size, self.max_length]))
+            if num_classes == 1:
+                expected = (logits > 0).long()
+            else:
+                expected = torch.argmax(logits, dim=-1)
+            self.assertTrue(torch.equal(preds, expected))
+
+    def test_amp_dtype(self):
+        r"""Tests the mixed precision option.
+        """
+        inputs = torch.randint(30521, (self.batch_size, self.max_length))
+
+        hparams = {
+            "pretrained_model_name": None,
+            "amp_dtype": "float16",
+        }
+        classifier = BERTClassifier(hparams=hparams)
+        logits, preds = classifier(inputs)
+
+        self.assertEqual(logits.dtype, torch.float32)
+        self.assertEqual(logits.shape, torch.Size(
+            [self.batch_size, classifier.output_size]))
+        self.assertEqual(preds.shape, torch.Size([self.batch_size]))
+
+        hparams = {
+            "pretrained_model_name": None,
+            "amp_dtype": "int8",
+        }
+        with self.assertRaises(ValueError):
+            BERTClassifier(hparams=hparams)
+
     def test_soft_ids(self):
         r"""Tests soft ids.
         """
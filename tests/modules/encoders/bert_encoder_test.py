@@ -184,6 +184,25 @@ class BERTEncoderTest(unittest.TestCase):
             pooled_output.shape,
             torch.Size([self.batch_size, encoder.output_size]))
 
+    def test_default_segment_ids(self):
+        r"""Tests that omitting `segment_ids` is the same as passing all
+        zeros.
+        """
+        hparams = {
+            "pretrained_model_name": None,
+        }
+        encoder = BERTEncoder(hparams=hparams)
+        encoder.eval()
+
+        inputs = torch.randint(30521, (self.batch_size, self.max_length))
+        segment_ids = torch.zeros_like(inputs)
+        outputs, pooled_output = encoder(inputs)
+        expected_outputs, expected_pooled_output = encoder(
+            inputs, segment_ids=segment_ids)
+
+        self.assertTrue(torch.allclose(outputs, expected_outputs))
+        self.assertTrue(torch.allclose(pooled_output, expected_pooled_output))
+
     def test_soft_ids(self):
         r"""Tests soft ids.
         """
@@ -14,7 +14,9 @@
 """
 BERT classifier.
 """
-from typing import Optional, Tuple, Union
+import inspect
+from functools import lru_cache
+from typing import Callable, Optional, Tuple, Union
 
 import torch
 from torch import nn
@@ -25,13 +27,71 @@ from texar.torch.hyperparams import HParams
 from texar.torch.modules.classifiers.classifier_base import ClassifierBase
 from texar.torch.modules.encoders.bert_encoder import BERTEncoder
 from texar.torch.modules.pretrained.bert import PretrainedBERTMixin
-from texar.torch.utils.utils import dict_fetch
+from texar.torch.utils.utils import dict_fetch, get_args
 
 __all__ = [
-    "BERTClassifier"
+    "BERTClassifier",
+    "build_trt_engine",
 ]
 
 
+def _compute_preds(logits: torch.Tensor, is_binary: bool, time_wise: bool,
+                   binary_preds_dtype: torch.dtype) \
+        -> Tuple[torch.Tensor, torch.Tensor]:
+    r"""Computes the predictions from :attr:`logits` and reshapes both tensors
+    to the output shapes of :meth:`BERTClassifier.forward`.
+    """
+    if is_binary:
+        # Reshape `logits` first, which is free, so that the comparison
+        # directly produces predictions of the output shape.
+        if time_wise:
+            logits = torch.squeeze(logits, -1)
+        elif logits.dim() > 1:
+            logits = torch.flatten(logits)
+        preds = (logits > 0).to(binary_preds_dtype)
+    else:
+        preds = torch.argmax(logits, dim=-1)
+        # `logits` of sequence-level classification are of shape
+        # `[batch_size, num_classes]`, so `preds` is usually already 1D.
+        if not time_wise and preds.dim() > 1:
+            preds = torch.flatten(preds)
+    return logits, preds
+
+
+@lru_cache(maxsize=None)
+def _compiled_compute_preds() \
+        -> Callable[..., Tuple[torch.Tensor, torch.Tensor]]:
+    r"""Returns :func:`_compute_preds` compiled with :func:`torch.compile`,
+    shared by all classifiers. Inductor fuses the comparison and cast (or the
+    argmax) into a single kernel.
+    """
+    return torch.compile(_compute_preds, dynamic=True)
+
+
+_PREDS_DTYPES = {
+    "int64": torch.int64,
+    "int8": torch.int8,
+    "bool": torch.bool,
+}
+
+_AMP_DTYPES = {
+    "float16": torch.float16,
+    "bfloat16": torch.bfloat16,
+}
+
+
+@lru_cache(maxsize=None)
+def _amp_supported(dtype: torch.dtype, device: torch.device) -> bool:
+    r"""Returns whether mixed precision with :attr:`dtype` is faster than FP32
+    on the CUDA :attr:`device`. FP16 requires tensor cores (compute capability
+    7.0+), and BF16 requires hardware support (compute capability 8.0+).
+    """
+    major, _ = torch.cuda.get_device_capability(device)
+    if dtype == torch.bfloat16:
+        return major >= 8
+    return major >= 7
+
+
 class BERTClassifier(ClassifierBase, PretrainedBERTMixin):
     r"""Classifier based on BERT modules. Please see
     :class:`~texar.torch.modules.PretrainedBERTMixin` for a brief description
@@ -71,6 +131,31 @@ class BERTClassifier(ClassifierBase, PretrainedBERTMixin):
 
         super().__init__(hparams=hparams)
 
+        # Cache the hyperparameters used in `forward` as plain attributes, as
+        # attribute lookups on `HParams` are slow. They are validated before
+        # creating the encoder, which may load a pre-trained checkpoint.
+        self._strategy = self._hparams.clas_strategy
+        self._max_seq_length = int(self._hparams.max_seq_length or 0)
+        if self._strategy == 'all_time' and not self._max_seq_length:
+            raise ValueError("hparams['max_seq_length'] is required if "
+                             "`clas_strategy` is 'all_time'.")
+
+        # Select the logits computation of the classification strategy once,
+        # so that `forward` does not dispatch on the strategy at each call.
+        # The function is stored unbound, because a bound method would create
+        # a reference cycle that delays freeing the module.
+        cls = type(self)
+        strategy_fns = {
+            'cls_time': cls._compute_cls_time_logits,
+            'all_time': cls._compute_all_time_logits,
+            'time_wise': cls._compute_time_wise_logits,
+        }
+        if self._strategy not in strategy_fns:
+            raise ValueError('Unknown classification strategy: {}'.format(
+                self._strategy))
+        self._compute_logits_fn: Callable[..., torch.Tensor] = \
+            strategy_fns[self._strategy]
+
         # Create the underlying encoder
         encoder_hparams = dict_fetch(hparams,
                                      self._ENCODER_CLASS.default_hparams())
@@ -80,6 +165,13 @@ class BERTClassifier(ClassifierBase, PretrainedBERTMixin):
             cache_dir=cache_dir,
             hparams=encoder_hparams)
 
+        # The feature size of the input to the logits layer
+        if self._strategy == 'all_time':
+            self._logit_input_dim = (self._encoder.output_size *
+                                     self._max_seq_length)
+        else:
+            self._logit_input_dim = self._encoder.output_size
+
         # Create a dropout layer
         self._dropout_layer = nn.Dropout(self._hparams.dropout)
 
@@ -97,16 +189,8 @@ class BERTClassifier(ClassifierBase, PretrainedBERTMixin):
             else:
                 logit_kwargs = logit_kwargs.todict()
 
-            if self._hparams.clas_strategy == 'all_time':
-                self._logits_layer = nn.Linear(
-                    self._encoder.output_size *
-                    self._hparams.max_seq_length,
-                    self.num_classes,
-                    **logit_kwargs)
-            else:
-                self._logits_layer = nn.Linear(
-                    self._encoder.output_size, self.num_classes,
-                    **logit_kwargs)
+            self._logits_layer = nn.Linear(
+                self._logit_input_dim, self.num_classes, **logit_kwargs)
 
         if self._hparams.initializer:
             initialize = get_initializer(self._hparams.initializer)
@@ -120,6 +204,52 @@ class BERTClassifier(ClassifierBase, PretrainedBERTMixin):
                          (self.num_classes <= 0 and
                           self._hparams.encoder.dim == 1)
 
+        self._time_wise = self._strategy == 'time_wise'
+        self._trim_to_max_length = self._hparams.trim_to_max_length
+        # Whether the `all_time` logits can be computed from a slice of the
+        # logits layer weight. See :meth:`_compute_all_time_logits`.
+        self._slice_logits_weight = isinstance(self._logits_layer, nn.Linear)
+
+        preds_dtype = self._hparams.preds_dtype
+        if preds_dtype not in _PREDS_DTYPES:
+            raise ValueError("hparams['preds_dtype'] must be one of 'int64', "
+                             "'int8' or 'bool'.")
+        self._preds_dtype = _PREDS_DTYPES[preds_dtype]
+
+        amp_dtype = self._hparams.amp_dtype
+        if amp_dtype == "float32":
+            self._amp_dtype = None
+        elif amp_dtype in _AMP_DTYPES:
+            if not hasattr(torch, 'autocast'):
+                raise ValueError("hparams['amp_dtype'] requires PyTorch 1.10 "
+                                 "or higher.")
+            self._amp_dtype = _AMP_DTYPES[amp_dtype]
+        else:
+            raise ValueError("hparams['amp_dtype'] must be one of 'float32', "
+                             "'float16' or 'bfloat16'.")
+
+        self._compile_preds = self._hparams.compile_preds
+        if self._compile_preds and not hasattr(torch, 'compile'):
+            raise ValueError("hparams['compile_preds'] requires PyTorch 2.0 "
+                             "or higher.")
+
+        # State of the CUDA graph captured by `capture_graph`.
+        self._cuda_graph: Optional['torch.cuda.CUDAGraph'] = None
+        self._graph_inputs: Tuple[Optional[torch.Tensor], ...] = ()
+        self._graph_outputs: Tuple[torch.Tensor, ...] = ()
+
+        if self._hparams.compile:
+            if not hasattr(torch, 'compile'):
+                raise ValueError("hparams['compile'] requires PyTorch 2.0 "
+                                 "or higher.")
+            # Compile the unbound method, so that copies of the module (e.g.,
+            # by `quantize_dynamic`) do not call into the original module.
+            self._compiled_forward = torch.compile(
+                type(self)._forward_impl, mode='reduce-overhead',
+                dynamic=True)
+        else:
+            self._compiled_forward = None
+
     @staticmethod
     def default_hparams():
         r"""Returns a dictionary of hyperparameters with default values.
@@ -135,6 +265,11 @@ class BERTClassifier(ClassifierBase, PretrainedBERTMixin):
                 "clas_strategy": "cls_time",
                 "max_seq_length": None,
                 "dropout": 0.1,
+                "preds_dtype": "int64",
+                "amp_dtype": "float32",
+                "compile": False,
+                "compile_preds": False,
+                "trim_to_max_length": False,
                 "name": "bert_classifier"
             }
 
@@ -180,6 +315,50 @@ class BERTClassifier(ClassifierBase, PretrainedBERTMixin):
             `"dropout"`: float
                 The dropout rate of the BERT encoder output.
 
+            `"preds_dtype"`: str
+                The data type of predictions in binary classification, one of
+                ``"int64"``, ``"int8"`` or ``"bool"``. Smaller types reduce the
+                memory traffic of the predictions. Predictions of multi-class
+                classification are always of type ``int64``.
+
+            `"amp_dtype"`: str
+                The data type used to run the encoder and the logits layer
+                under :func:`torch.autocast` on CUDA devices. One of
+                ``"float32"`` (autocast disabled), ``"float16"`` or
+                ``"bfloat16"``. Autocast is only enabled on GPUs where the
+                reduced precision is supported by hardware (compute capability
+                7.0+ for ``"float16"``, 8.0+ for ``"bfloat16"``); otherwise the
+                computation falls back to FP32. Predictions are always
+                computed from FP32 logits.
+
+            `"compile"`: bool
+                Whether to compile :meth:`forward` with :func:`torch.compile`
+                (requires PyTorch 2.0+). Compilation happens on the first call
+                and fuses the small operations following the encoder into
+                fewer kernels. Dynamic shapes are enabled so that different
+                batch sizes and sequence lengths do not trigger
+                recompilation. On CUDA devices, the compiled :meth:`forward`
+                runs through CUDA graphs, and its outputs are cloned so that
+                they are not overwritten by later calls.
+
+            `"compile_preds"`: bool
+                Whether to compile only the computation of predictions from
+                logits with :func:`torch.compile` (requires PyTorch 2.0+),
+                which fuses the comparison and cast (or the argmax) into a
+                single kernel. This is cheaper to compile than the whole
+                :meth:`forward`, and is implied by ``compile``.
+
+            `"trim_to_max_length"`: bool
+                Whether to remove the time steps beyond the longest sequence
+                in the batch (as given by `sequence_length`) before running
+                the encoder. This saves computation on batches padded to a
+                fixed length. The results are the same as for inputs padded
+                only up to the longest sequence: under the ``all_time``
+                strategy, the removed time steps are treated as padding, and
+                under the ``time_wise`` strategy, their `logits` are zero.
+                Reading the longest length requires a device-to-host
+                synchronization.
+
             `"name"`: str
                 Name of the classifier.
         """
@@ -191,6 +370,11 @@ class BERTClassifier(ClassifierBase, PretrainedBERTMixin):
             "clas_strategy": "cls_time",
             "max_seq_length": None,
             "dropout": 0.1,
+            "preds_dtype": "int64",
+            "amp_dtype": "float32",
+            "compile": False,
+            "compile_preds": False,
+            "trim_to_max_length": False,
             "name": "bert_classifier"
         })
         return hparams
@@ -199,7 +383,7 @@ class BERTClassifier(ClassifierBase, PretrainedBERTMixin):
                 inputs: Union[torch.Tensor, torch.LongTensor],
                 sequence_length: Optional[torch.LongTensor] = None,
                 segment_ids: Optional[torch.LongTensor] = None) \
-            -> Tuple[torch.Tensor, torch.LongTensor]:
+            -> Tuple[torch.Tensor, torch.Tensor]:
         r"""Feeds the inputs through the network and makes classification.
 
         The arguments are the same as in
@@ -238,48 +422,337 @@ class BERTClassifier(ClassifierBase, PretrainedBERTMixin):
                 - If ``num_classes`` > 1, ``logits`` is of shape
                   ``[batch_size, max_time, num_classes]`` and ``pred`` is of
                   shape ``[batch_size, max_time]``.
+
+            ``pred`` is of type ``int64``, except in binary classification,
+            where its type is given by the ``preds_dtype`` hyperparameter.
         """
-        enc_outputs, pooled_output = self._encoder(inputs,
-                                                   sequence_length,
-                                                   segment_ids)
-        # Compute logits
-        strategy = self._hparams.clas_strategy
-        if strategy == 'time_wise':
-            logits = enc_outputs
-        elif strategy == 'cls_time':
-            logits = pooled_output
-        elif strategy == 'all_time':
-            # Pad `enc_outputs` to have max_seq_length before flatten
-            length_diff = self._hparams.max_seq_length - inputs.shape[1]
-            logit_input = F.pad(enc_outputs, [0, 0, 0, length_diff, 0, 0])
-            logit_input_dim = (self._encoder.output_size *
-                               self._hparams.max_seq_length)
-            logits = logit_input.view(-1, logit_input_dim)
+        if self._compiled_forward is not None and not torch.jit.is_tracing():
+            logits, preds = self._compiled_forward(
+                self, inputs, sequence_length, segment_ids)
+            # On CUDA, the compiled `forward` replays CUDA graphs, whose
+            # outputs are overwritten by the next call. Clone them so that the
+            # results of previous calls (e.g., predictions collected across
+            # batches) stay valid.
+            if logits.is_cuda:
+                logits, preds = logits.clone(), preds.clone()
+            return logits, preds
+        return self._forward_impl(inputs, sequence_length, segment_ids)
+
+    def _forward_impl(self,
+                      inputs: Union[torch.Tensor, torch.LongTensor],
+                      sequence_length: Optional[torch.LongTensor],
+                      segment_ids: Optional[torch.LongTensor]) \
+            -> Tuple[torch.Tensor, torch.Tensor]:
+        r"""The implementation of :meth:`forward`, which may be wrapped by
+        :func:`torch.compile`.
+        """
+        if (self._amp_dtype is not None and inputs.is_cuda and
+                _amp_supported(self._amp_dtype, inputs.device)):
+            with torch.autocast('cuda', dtype=self._amp_dtype):
+                logits = self._compute_logits_fn(
+                    self, inputs, sequence_length, segment_ids)
+            logits = logits.float()
         else:
-            raise ValueError('Unknown classification strategy: {}'.format(
-                strategy))
+            logits = self._compute_logits_fn(
+                self, inputs, sequence_length, segment_ids)
+
+        # Compute predictions
+        if self._compile_preds:
+            compute_preds = _compiled_compute_preds()
+        else:
+            compute_preds = _compute_preds
+        logits, preds = compute_preds(
+            logits, self.is_binary, self._time_wise, self._preds_dtype)
 
+        return logits, preds
+
+    def _trim_inputs(self, inputs: Union[torch.Tensor, torch.LongTensor],
+                     sequence_length: Optional[torch.LongTensor],
+                     segment_ids: Optional[torch.LongTensor]) \
+            -> Tuple[torch.Tensor, Optional[torch.LongTensor]]:
+        r"""If ``trim_to_max_length`` is `True`, removes the time steps of
+        :attr:`inputs` and :attr:`segment_ids` beyond the longest sequence.
+        Otherwise returns them unchanged.
+        """
+        if self._trim_to_max_length and sequence_length is not None:
+            max_length = int(sequence_length.max())
+            if max_length < inputs.size(1):
+                inputs = inputs[:, :max_length]
+                if segment_ids is not None:
+                    segment_ids = segment_ids[:, :max_length]
+        return inputs, segment_ids
+
+    def _encode(self, inputs: Union[torch.Tensor, torch.LongTensor],
+                sequence_length: Optional[torch.LongTensor],
+                segment_ids: Optional[torch.LongTensor]) \
+            -> Tuple[torch.Tensor, torch.Tensor]:
+        r"""Runs the encoder on the inputs trimmed by :meth:`_trim_inputs`,
+        so the returned :attr:`enc_outputs` may be shorter than
+        :attr:`inputs`.
+        """
+        inputs, segment_ids = self._trim_inputs(
+            inputs, sequence_length, segment_ids)
+        return self._encoder(inputs, sequence_length, segment_ids)
+
+    def _apply_logits_layer(self, logits: torch.Tensor) -> torch.Tensor:
+        r"""Applies dropout and the logits layer, if there is one."""
         if self._logits_layer is not None:
             logits = self._dropout_layer(logits)
             logits = self._logits_layer(logits)
+        return logits
+
+    def _compute_cls_time_logits(
+            self, inputs: Union[torch.Tensor, torch.LongTensor],
+            sequence_length: Optional[torch.LongTensor],
+            segment_ids: Optional[torch.LongTensor]) -> torch.Tensor:
+        r"""Runs the encoder and computes the logits of the `cls_time`
+        strategy. See :meth:`forward` for the arguments.
+        """
+        _, pooled_output = self._encode(inputs, sequence_length, segment_ids)
+        return self._apply_logits_layer(pooled_output)
+
+    def _compute_time_wise_logits(
+            self, inputs: Union[torch.Tensor, torch.LongTensor],
+            sequence_length: Optional[torch.LongTensor],
+            segment_ids: Optional[torch.LongTensor]) -> torch.Tensor:
+        r"""Runs the encoder and computes the logits of the `time_wise`
+        strategy. See :meth:`forward` for the arguments.
+        """
+        enc_outputs, _ = self._encode(inputs, sequence_length, segment_ids)
+        logits = self._apply_logits_layer(enc_outputs)
+        length_diff = inputs.size(1) - logits.size(1)
+        if length_diff > 0:
+            # Pad the time steps removed by `_encode`
+            logits = F.pad(logits, [0, 0, 0, length_diff])
+        return logits
+
+    def _compute_all_time_logits(
+            self, inputs: Union[torch.Tensor, torch.LongTensor],
+            sequence_length: Optional[torch.LongTensor],
+            segment_ids: Optional[torch.LongTensor]) -> torch.Tensor:
+        r"""Runs the encoder and computes the logits of the `all_time`
+        strategy. See :meth:`forward` for the arguments.
+
+        With a (non-quantized) logits layer, the encoder outputs are not
+        padded to ``max_seq_length``. The weight of the logits layer has shape
+        `[num_classes, max_seq_length * hidden_size]`, with columns ordered by
+        time step. Columns of the padded time steps would only be multiplied
+        by zeros, so they are sliced off instead. The slice is a strided view
+        of the weight, which the matrix multiplication consumes without a
+        copy.
+        """
+        # Check the length after trimming, which may remove time steps beyond
+        # `max_seq_length`, but before running the encoder.
+        inputs, segment_ids = self._trim_inputs(
+            inputs, sequence_length, segment_ids)
+        if inputs.size(1) > self._max_seq_length:
+            raise ValueError(
+                "Length of `inputs` ({}) exceeds hparams['max_seq_length'] "
+                "({}).".format(inputs.size(1), self._max_seq_length))
+        enc_outputs, _ = self._encoder(inputs, sequence_length, segment_ids)
+
+        if not self._slice_logits_weight:
+            # Pad `enc_outputs` to have max_seq_length before flatten
+            length_diff = self._max_seq_length - enc_outputs.size(1)
+            if length_diff > 0:
+                enc_outputs = F.pad(enc_outputs, [0, 0, 0, length_diff])
+            # Both the encoder and `F.pad` return contiguous tensors, for which
+            # `reshape` only changes metadata. Unlike `view`, it falls back to
+            # a copy if `enc_outputs` is not contiguous instead of failing.
+            logits = enc_outputs.reshape(-1, self._logit_input_dim)
+            return self._apply_logits_layer(logits)
+
+        # Flattening is free for the contiguous encoder outputs, see above.
+        logit_input = enc_outputs.reshape(enc_outputs.size(0), -1)
+        logit_input = self._dropout_layer(logit_input)
+        weight = self._logits_layer.weight[:, :logit_input.size(1)]
+        return F.linear(logit_input, weight, self._logits_layer.bias)
+
+    def quantize_dynamic(self, inplace: bool = False) -> 'BERTClassifier':
+        r"""Applies post-training dynamic quantization to the classifier.
+        Weights of all :torch_nn:`Linear` layers, including those of the
+        encoder and the logits layer, are converted to `int8`, and activations
+        are quantized on the fly. This reduces the size of the weights by 4x
+        and speeds up inference on CPU.
+
+        Quantized modules only support inference on CPU.
 
-        # Compute predictions
-        if strategy == "time_wise":
-            if self.is_binary:
-                logits = torch.squeeze(logits, -1)
-                preds = (logits > 0).long()
-            else:
-                preds = torch.argmax(logits, dim=-1)
+        Args:
+            inplace (bool): Whether to quantize this module in place. If
+                `False` (default), a quantized copy is returned and this module
+                is unchanged.
+
+        Returns:
+            The quantized classifier.
+        """
+        if hasattr(torch, 'ao'):
+            from torch.ao import quantization
         else:
-            if self.is_binary:
-                preds = (logits > 0).long()
-                logits = torch.flatten(logits)
-            else:
-                preds = torch.argmax(logits, dim=-1)
-            preds = torch.flatten(preds)
+            from torch import quantization  # type: ignore
+        model = quantization.quantize_dynamic(
+            self, {nn.Linear}, dtype=torch.qint8, inplace=inplace)
+        model._slice_logits_weight = False
+        return model
+
+    def capture_graph(self,
+                      inputs: Union[torch.Tensor, torch.LongTensor],
+                      sequence_length: Optional[torch.LongTensor] = None,
+                      segment_ids: Optional[torch.LongTensor] = None,
+                      num_warmup: int = 3):
+        r"""Captures the inference computation of :meth:`forward` into a CUDA
+        graph, for serving inputs of a fixed shape. Replaying the graph with
+        :meth:`replay_graph` launches all kernels at once, which removes the
+        kernel launch overhead that dominates at small batch sizes.
+
+        The arguments are example inputs on a CUDA device, with the same
+        shapes and types as the inputs to serve. The graph is captured under
+        :func:`torch.no_grad`; put the module in evaluation mode beforehand
+        to disable dropout.
+
+        Args:
+            inputs: Example input, see :meth:`forward`.
+            sequence_length (optional): Example sequence lengths. If `None`,
+                :meth:`replay_graph` must not be given `sequence_length`.
+            segment_ids (optional): Example segment ids. If `None`,
+                :meth:`replay_graph` must not be given `segment_ids`.
+            num_warmup (int): The number of forward passes to run before
+                capturing.
+        """
+        if not inputs.is_cuda:
+            raise ValueError("CUDA graphs require `inputs` on a CUDA device.")
+        if self._trim_to_max_length:
+            raise ValueError("CUDA graphs cannot be captured when "
+                             "hparams['trim_to_max_length'] is True, which "
+                             "requires a device-to-host synchronization.")
+
+        static_inputs = (inputs.clone(),
+                         None if sequence_length is None
+                         else sequence_length.clone(),
+                         None if segment_ids is None else segment_ids.clone())
+
+        # Warm up on a side stream, as required before capturing
+        stream = torch.cuda.Stream(device=inputs.device)
+        stream.wait_stream(torch.cuda.current_stream(inputs.device))
+        with torch.no_grad(), torch.cuda.stream(stream):
+            for _ in range(num_warmup):
+                self._forward_impl(*static_inputs)
+        torch.cuda.current_stream(inputs.device).wait_stream(stream)
+
+        graph = torch.cuda.CUDAGraph()
+        with torch.no_grad(), torch.cuda.graph(graph):
+            static_outputs = self._forward_impl(*static_inputs)
+
+        self._cuda_graph = graph
+        self._graph_inputs = static_inputs
+        self._graph_outputs = static_outputs
+
+    def replay_graph(self,
+                     inputs: Union[torch.Tensor, torch.LongTensor],
+                     sequence_length: Optional[torch.LongTensor] = None,
+                     segment_ids: Optional[torch.LongTensor] = None) \
+            -> Tuple[torch.Tensor, torch.Tensor]:
+        r"""Runs the CUDA graph captured by :meth:`capture_graph` on new
+        inputs, which must have the same shapes and types as the example
+        inputs. :attr:`sequence_length` and :attr:`segment_ids` must be given
+        if and only if they were given to :meth:`capture_graph`.
 
+        Returns:
+            A tuple `(logits, preds)`, as in :meth:`forward`. The returned
+            tensors are overwritten by the next replay; clone them if they
+            need to be kept.
+        """
+        if self._cuda_graph is None:
+            raise ValueError("No CUDA graph is captured. Call "
+                             "`capture_graph` first.")
+        names = ('inputs', 'sequence_length', 'segment_ids')
+        new_inputs = (inputs, sequence_length, segment_ids)
+        for name, static_input, new_input in zip(
+                names, self._graph_inputs, new_inputs):
+            if static_input is None:
+                if new_input is not None:
+                    raise ValueError(
+                        "`{}` was not given to `capture_graph`, and cannot "
+                        "be given to `replay_graph`.".format(name))
+            elif new_input is None:
+                raise ValueError(
+                    "`{}` was given to `capture_graph`, and must also be "
+                    "given to `replay_graph`.".format(name))
+            elif (new_input.shape != static_input.shape or
+                  new_input.dtype != static_input.dtype):
+                raise ValueError(
+                    "`{}` must have shape {} and type {} as in "
+                    "`capture_graph`, but has shape {} and type {}.".format(
+                        name, tuple(static_input.shape), static_input.dtype,
+                        tuple(new_input.shape), new_input.dtype))
+        # Validate all inputs before overwriting any static input
+        for static_input, new_input in zip(self._graph_inputs, new_inputs):
+            if static_input is not None:
+                static_input.copy_(new_input)
+        self._cuda_graph.replay()
+        logits, preds = self._graph_outputs
         return logits, preds
 
+    def to_onnx(self, path: str, opset: int = 17,
+                seq_length: int = 128):
+        r"""Exports the classifier to an ONNX model, e.g., for serving with
+        TensorRT (see :func:`~texar.torch.modules.build_trt_engine`).
+
+        The exported model has inputs ``inputs``, ``sequence_length`` and
+        ``segment_ids`` (if accepted by :meth:`forward`), and outputs
+        ``logits`` and ``preds``, as in :meth:`forward`. The batch dimension
+        is dynamic. The time dimension is also dynamic, except for the
+        ``all_time`` strategy, where it is fixed to ``max_seq_length`` so that
+        the padding is folded into the graph.
+
+        Args:
+            path (str): The path of the ONNX file to write.
+            opset (int): The ONNX opset version.
+            seq_length (int): The length of the example inputs used to trace
+                the model. Ignored for the ``all_time`` strategy.
+        """
+        if self._strategy == 'all_time':
+            seq_length = self._max_seq_length
+        device = next(self.parameters()).device
+        batch_size = 2
+        inputs = torch.zeros(batch_size, seq_length, dtype=torch.long,
+                             device=device)
+        sequence_length = torch.full((batch_size,), seq_length,
+                                     dtype=torch.long, device=device)
+        args: Tuple[torch.Tensor, ...] = (inputs, sequence_length)
+        input_names = ['inputs', 'sequence_length']
+        if 'segment_ids' in get_args(self.forward):
+            args += (torch.zeros_like(inputs),)
+            input_names.append('segment_ids')
+
+        time_dims = {} if self._strategy == 'all_time' else {1: 'max_time'}
+        dynamic_axes = {name: {0: 'batch_size'} for name in input_names}
+        dynamic_axes['inputs'].update(time_dims)
+        if 'segment_ids' in dynamic_axes:
+            dynamic_axes['segment_ids'].update(time_dims)
+        output_dims = {0: 'batch_size'}
+        if self._strategy == 'time_wise':
+            output_dims.update(time_dims)
+        dynamic_axes['logits'] = output_dims
+        dynamic_axes['preds'] = output_dims
+
+        export_kwargs = {}
+        if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+            # Use the TorchScript-based exporter, which supports
+            # `dynamic_axes` and does not require `onnxscript`.
+            export_kwargs['dynamo'] = False
+
+        training = self.training
+        self.eval()
+        try:
+            torch.onnx.export(self, args, path,
+                              input_names=input_names,
+                              output_names=['logits', 'preds'],
+                              dynamic_axes=dynamic_axes,
+                              opset_version=opset,
+                              **export_kwargs)
+        finally:
+            self.train(training)
+
     @property
     def output_size(self) -> int:
         r"""The feature size of :meth:`forward` output :attr:`logits`.
@@ -291,12 +764,81 @@ class BERTClassifier(ClassifierBase, PretrainedBERTMixin):
             logit_dim = -1
         elif self._hparams.num_classes > 1:
             logit_dim = self._hparams.num_classes
-        elif self._hparams.clas_strategy == 'all_time':
-            logit_dim = (self._encoder.output_size *
-                         self._hparams.max_seq_length)
-        elif self._hparams.clas_strategy == 'cls_time':
-            logit_dim = self._encoder.output_size
-        elif self._hparams.clas_strategy == 'time_wise':
+        elif self._strategy in ('all_time', 'cls_time'):
+            logit_dim = self._logit_input_dim
+        elif self._strategy == 'time_wise':
             logit_dim = self._hparams.encoder.dim
 
         return logit_dim
+
+
+def build_trt_engine(onnx_path: str, fp16: bool = True,
+                     max_batch_size: int = 32, max_seq_length: int = 128):
+    r"""Builds a TensorRT engine from an ONNX model, such as one exported by
+    :meth:`BERTClassifier.to_onnx`. Requires the `tensorrt` library.
+
+    Example:
+
+        .. code-block:: python
+
+            classifier.to_onnx("classifier.onnx")
+            engine = build_trt_engine("classifier.onnx", fp16=True)
+            with open("classifier.engine", "wb") as f:
+                f.write(engine)
+
+    Args:
+        onnx_path (str): The path of the ONNX model.
+        fp16 (bool): Whether to allow TensorRT to use FP16 kernels.
+        max_batch_size (int): The maximum batch size the engine accepts, if
+            the batch dimension of the model is dynamic.
+        max_seq_length (int): The maximum sequence length the engine accepts,
+            if the time dimension of the model is dynamic.
+
+    Returns:
+        The serialized engine.
+    """
+    try:
+        import tensorrt as trt
+    except ImportError:
+        raise ImportError(
+            "To build TensorRT engines, the tensorrt library must be "
+            "installed. Please see "
+            "https://docs.nvidia.com/deeplearning/tensorrt/install-guide/.")
+
+    logger = trt.Logger(trt.Logger.WARNING)
+    builder = trt.Builder(logger)
+    flags = 0
+    if hasattr(trt.NetworkDefinitionCreationFlag, 'EXPLICIT_BATCH'):
+        # Required before TensorRT 10, where explicit batch is the default.
+        flags = 1 << int(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH)
+    network = builder.create_network(flags)
+    parser = trt.OnnxParser(network, logger)
+    with open(onnx_path, 'rb') as f:
+        if not parser.parse(f.read()):
+            errors = [str(parser.get_error(i))
+                      for i in range(parser.num_errors)]
+            raise ValueError("Failed to parse ONNX model {}:\n{}".format(
+                onnx_path, "\n".join(errors)))
+
+    config = builder.create_builder_config()
+    if fp16:
+        config.set_flag(trt.BuilderFlag.FP16)
+
+    # Dynamic dimensions are the batch dimension (0) and the time
+    # dimension (1).
+    profile = builder.create_optimization_profile()
+    for i in range(network.num_inputs):
+        tensor = network.get_input(i)
+        max_dims = (max_batch_size, max_seq_length)
+        min_shape = [1 if dim == -1 else dim for dim in tensor.shape]
+        max_shape = [max_dims[idx] if dim == -1 else dim
+                     for idx, dim in enumerate(tensor.shape)]
+        profile.set_shape(tensor.name, min_shape, max_shape, max_shape)
+    config.add_optimization_profile(profile)
+
+    engine = builder.build_serialized_network(network, config)
+    if engine is None:
+        raise ValueError("Failed to build TensorRT engine from ONNX model "
+                         "{}. See the TensorRT log for details.".format(
+                             onnx_path))
+    return engine
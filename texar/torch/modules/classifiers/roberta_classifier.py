@@ -75,6 +75,11 @@ class RoBERTaClassifier(PretrainedRoBERTaMixin, BERTClassifier):
                 "clas_strategy": "cls_time",
                 "max_seq_length": None,
                 "dropout": 0.1,
+                "preds_dtype": "int64",
+                "amp_dtype": "float32",
+                "compile": False,
+                "compile_preds": False,
+                "trim_to_max_length": False,
                 "name": "roberta_classifier"
             }
 
@@ -120,6 +125,33 @@ class RoBERTaClassifier(PretrainedRoBERTaMixin, BERTClassifier):
             `"dropout"`: float
                 The dropout rate of the RoBERTa encoder output.
 
+            `"preds_dtype"`: str
+                The data type of predictions in binary classification, one of
+                ``"int64"``, ``"int8"`` or ``"bool"``. See
+                :meth:`~texar.torch.modules.BERTClassifier.default_hparams`.
+
+            `"amp_dtype"`: str
+                The data type used to run the encoder and the logits layer
+                under :func:`torch.autocast` on CUDA devices. One of
+                ``"float32"`` (autocast disabled), ``"float16"`` or
+                ``"bfloat16"``. See
+                :meth:`~texar.torch.modules.BERTClassifier.default_hparams`.
+
+            `"compile"`: bool
+                Whether to compile :meth:`forward` with :func:`torch.compile`
+                (requires PyTorch 2.0+). See
+                :meth:`~texar.torch.modules.BERTClassifier.default_hparams`.
+
+            `"compile_preds"`: bool
+                Whether to compile only the computation of predictions from
+                logits with :func:`torch.compile`. See
+                :meth:`~texar.torch.modules.BERTClassifier.default_hparams`.
+
+            `"trim_to_max_length"`: bool
+                Whether to remove the time steps beyond the longest sequence
+                in the batch before running the encoder. See
+                :meth:`~texar.torch.modules.BERTClassifier.default_hparams`.
+
             `"name"`: str
                 Name of the classifier.
         """
@@ -131,6 +163,11 @@ class RoBERTaClassifier(PretrainedRoBERTaMixin, BERTClassifier):
             "clas_strategy": "cls_time",
             "max_seq_length": None,
             "dropout": 0.1,
+            "preds_dtype": "int64",
+            "amp_dtype": "float32",
+            "compile": False,
+            "compile_preds": False,
+            "trim_to_max_length": False,
             "name": "roberta_classifier"
         })
         return hparams
@@ -138,7 +175,7 @@ class RoBERTaClassifier(PretrainedRoBERTaMixin, BERTClassifier):
     def forward(self,  # type: ignore
                 inputs: Union[torch.Tensor, torch.LongTensor],
                 sequence_length: Optional[torch.LongTensor] = None) \
-            -> Tuple[torch.Tensor, torch.LongTensor]:
+            -> Tuple[torch.Tensor, torch.Tensor]:
         r"""Feeds the inputs through the network and makes classification.
 
         The arguments are the same as in
@@ -173,6 +210,9 @@ class RoBERTaClassifier(PretrainedRoBERTaMixin, BERTClassifier):
                 - If ``num_classes`` > 1, ``logits`` is of shape
                   ``[batch_size, max_time, num_classes]`` and ``pred`` is of
                   shape ``[batch_size, max_time]``.
+
+            ``pred`` is of type ``int64``, except in binary classification,
+            where its type is given by the ``preds_dtype`` hyperparameter.
         """
         logits, preds = super().forward(inputs=inputs,
                                         sequence_length=sequence_length,
@@ -146,7 +146,7 @@ class PositionEmbedder(EmbedderBase):
             single_inputs = torch.arange(start=0, end=max_length)
             # Expands `single_inputs` to have shape [batch_size, max_length]
             inputs = single_inputs.unsqueeze(0)
-            inputs = inputs.expand(len(sequence_length), -1).contiguous()
+            inputs = inputs.expand(sequence_length.size(0), -1).contiguous()
         else:
             inputs = positions
 
@@ -83,6 +83,8 @@ class BERTEncoder(EncoderBase, PretrainedBERTMixin):
                 self.segment_embedder = WordEmbedder(
                     vocab_size=self._hparams.type_vocab_size,
                     hparams=self._hparams.segment_embed)
+                self._segment_dropout = \
+                    self.segment_embedder.hparams.dropout_rate > 0
 
         # Position embedding
         self.position_embedder = PositionEmbedder(
@@ -332,15 +334,26 @@ class BERTEncoder(EncoderBase, PretrainedBERTMixin):
             raise ValueError("'inputs' should be a 2D or 3D tensor.")
 
         batch_size = inputs.size(0)
-        pos_length = inputs.new_full((batch_size,), inputs.size(1),
-                                     dtype=torch.int64)
-        pos_embeds = self.position_embedder(sequence_length=pos_length)
+        # Create the positions on the device of `inputs`. Passing
+        # `sequence_length` instead would read its maximum on the host, which
+        # requires a device-to-host synchronization.
+        positions = torch.arange(inputs.size(1), device=inputs.device)
+        positions = positions.unsqueeze(0).expand(batch_size, -1)
+        pos_embeds = self.position_embedder(positions=positions)
 
         if self.segment_embedder is not None:
             if segment_ids is None:
-                segment_ids = torch.zeros((inputs.size(0), inputs.size(1)),
-                                          dtype=torch.long,
-                                          device=inputs.device)
+                if self._segment_dropout and self.training:
+                    # Dropout masks differ across tokens, so each token needs
+                    # its own embedding.
+                    segment_ids = torch.zeros(
+                        (inputs.size(0), inputs.size(1)), dtype=torch.long,
+                        device=inputs.device)
+                else:
+                    # All tokens are in segment 0. Look up its embedding once
+                    # and broadcast it in the sum below, instead of creating
+                    # and embedding `[batch_size, max_time]` zero ids.
+                    segment_ids = inputs.new_zeros((1, 1), dtype=torch.long)
             segment_embeds = self.segment_embedder(segment_ids)
             inputs_embeds = word_embeds + segment_embeds + pos_embeds
         else: